@@ -9,3 +9,6 @@ output_dir = os.path.join(project_root, 'data')
 # Ensure the output directory exists
 if not os.path.exists(output_dir):
     os.makedirs(output_dir)
+
+# Define the run history database path (kept across runs)
+history_db_path = os.path.join(output_dir, 'history.sqlite3')
@@ -0,0 +1,72 @@
+import sys
+
+
+class CatalogRecord:
+    """Compact catalog row with a read-only dict-like interface.
+
+    Rows use `__slots__` instead of a per-row dict, and repeated names (schema,
+    table, type...) are interned so every row shares the same string objects.
+    """
+    __slots__ = ()
+    # Fields whose values repeat across rows and are interned
+    _interned = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            if value is not None and field in self._interned:
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return list(self.__slots__)
+
+    def values(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def items(self):
+        return list(zip(self.__slots__, self.values()))
+
+
+class TableRecord(CatalogRecord):
+    __slots__ = ('schema', 'name')
+    _interned = ('schema',)
+
+
+class ColumnRecord(CatalogRecord):
+    __slots__ = ('schema', 'table_name', 'column_name', 'data_type', 'is_nullable', 'column_default')
+    # column_default is left out: values such as nextval('<table>_id_seq'::regclass) are mostly unique
+    _interned = ('schema', 'table_name', 'column_name', 'data_type', 'is_nullable')
+
+
+class IndexRecord(CatalogRecord):
+    __slots__ = ('schema', 'table_name', 'name', 'definition')
+    _interned = ('schema', 'table_name')
+
+
+class RoutineRecord(CatalogRecord):
+    __slots__ = ('schema', 'name', 'arguments', 'definition')
+    _interned = ('schema',)
+
+
+class TriggerRecord(CatalogRecord):
+    __slots__ = ('schema', 'table_name', 'name', 'definition')
+    _interned = ('schema', 'table_name')
@@ -1,7 +1,12 @@
 import re
 
+from db.schemas.catalog_records import (ColumnRecord, IndexRecord, RoutineRecord, TableRecord,
+                                        TriggerRecord)
+
 
 class DBObjects:
+    # Rows fetched per round trip when streaming columns from a server-side cursor
+    COLUMNS_FETCH_SIZE = 10000
 
     @staticmethod
     def normalize_definition(definition):
@@ -13,6 +18,40 @@ class DBObjects:
         definition = re.sub(r'\s+', ' ', definition).strip()  # Replace multiple whitespace with single space
         return definition.lower()
 
+    @staticmethod
+    def _schema_condition(column, schema):
+        """Build the filter for one schema name or a list of schema names."""
+        if isinstance(schema, str):
+            return f" AND {column} = %s", (schema,)
+        return f" AND {column} = ANY(%s)", (list(schema),)
+
+    @staticmethod
+    def get_schema_object_counts(conn):
+        """Retrieve user schemas with their number of relations, columns and routines."""
+        query = """
+        SELECT n.nspname AS schema,
+               coalesce(c.relation_count, 0) + coalesce(a.column_count, 0) + coalesce(p.routine_count, 0)
+                   AS object_count
+        FROM pg_catalog.pg_namespace n
+             LEFT JOIN (SELECT relnamespace, count(*) AS relation_count
+                        FROM pg_catalog.pg_class
+                        GROUP BY relnamespace) c ON c.relnamespace = n.oid
+             LEFT JOIN (SELECT cls.relnamespace, count(*) AS column_count
+                        FROM pg_catalog.pg_attribute att
+                             JOIN pg_catalog.pg_class cls ON cls.oid = att.attrelid
+                        WHERE att.attnum > 0 AND NOT att.attisdropped
+                        GROUP BY cls.relnamespace) a ON a.relnamespace = n.oid
+             LEFT JOIN (SELECT pronamespace, count(*) AS routine_count
+                        FROM pg_catalog.pg_proc
+                        GROUP BY pronamespace) p ON p.pronamespace = n.oid
+        WHERE n.nspname NOT IN ('information_schema', 'pg_catalog')
+          AND n.nspname NOT LIKE 'pg\\_%'
+        ORDER BY schema;
+        """
+        with conn.cursor() as cur:
+            cur.execute(query)
+            return {row[0]: row[1] for row in cur.fetchall()}
+
     @staticmethod
     def get_tables(conn, schema=None):
         """Retrieve tables from the database connection."""
@@ -24,18 +63,19 @@ class DBObjects:
         """
         params = ()
         if schema:
-            query += " AND table_schema = %s"
-            params = (schema,)
+            condition, params = DBObjects._schema_condition('table_schema', schema)
+            query += condition
         query += " ORDER BY schema, table_name;"
         with conn.cursor() as cur:
             cur.execute(query, params)
-            tables = cur.fetchall()
-            columns = [desc[0] for desc in cur.description]
-        return [dict(zip(columns, row)) for row in tables]
+            return [TableRecord(*row) for row in cur]
 
     @staticmethod
-    def get_columns(conn, schema=None):
-        """Retrieve columns from the database connection."""
+    def get_columns(conn, schema=None, tables=None):
+        """Retrieve columns from the database connection.
+
+        `tables` optionally restricts the result to a list of (schema, table_name) pairs.
+        """
         query = """
         SELECT table_schema as schema, table_name, column_name, data_type, is_nullable, column_default
         FROM information_schema.columns
@@ -43,14 +83,59 @@ class DBObjects:
         """
         params = ()
         if schema:
-            query += " AND table_schema = %s"
-            params = (schema,)
+            condition, params = DBObjects._schema_condition('table_schema', schema)
+            query += condition
+        if tables is not None:
+            query += " AND (table_schema, table_name) IN (SELECT * FROM unnest(%s::text[], %s::text[]))"
+            params += ([t[0] for t in tables], [t[1] for t in tables])
         query += " ORDER BY schema, table_name, column_name;"
+        # Named (server-side) cursor: rows are streamed in batches of `itersize` instead of
+        # buffering the whole result client-side. WITH HOLD keeps it usable in autocommit mode.
+        with conn.cursor(name='get_columns', withhold=True) as cur:
+            cur.itersize = DBObjects.COLUMNS_FETCH_SIZE
+            cur.execute(query, params)
+            return [ColumnRecord(*row) for row in cur]
+
+    # Per-table hash over the ordered column signatures (name, type, nullability, default).
+    # Ordering uses COLLATE "C" so hashes do not depend on each cluster's default collation.
+    _TABLE_FINGERPRINT_QUERY = """
+        SELECT table_schema AS schema,
+               table_name,
+               md5(string_agg(
+                   concat_ws('|', column_name, data_type, is_nullable, quote_nullable(column_default)),
+                   ',' ORDER BY column_name::text COLLATE "C"
+               )) AS table_hash
+        FROM information_schema.columns
+        WHERE table_schema NOT IN ('information_schema', 'pg_catalog')
+        """
+
+    @staticmethod
+    def get_schema_fingerprints(conn, schema=None):
+        """Retrieve one column fingerprint per schema, computed server-side."""
+        query = DBObjects._TABLE_FINGERPRINT_QUERY
+        params = ()
+        if schema:
+            condition, params = DBObjects._schema_condition('table_schema', schema)
+            query += condition
+        query = f"""
+        SELECT schema, md5(string_agg(table_name || ':' || table_hash, ',' ORDER BY table_name::text COLLATE "C"))
+               AS schema_hash
+        FROM ({query} GROUP BY table_schema, table_name) t
+        GROUP BY schema
+        ORDER BY schema;
+        """
         with conn.cursor() as cur:
             cur.execute(query, params)
-            columns = cur.fetchall()
-            col_names = [desc[0] for desc in cur.description]
-        return [dict(zip(col_names, row)) for row in columns]
+            return {row[0]: row[1] for row in cur.fetchall()}
+
+    @staticmethod
+    def get_table_fingerprints(conn, schemas):
+        """Retrieve one column fingerprint per table for the given schemas, computed server-side."""
+        query = DBObjects._TABLE_FINGERPRINT_QUERY
+        query += " AND table_schema = ANY(%s) GROUP BY table_schema, table_name ORDER BY schema, table_name;"
+        with conn.cursor() as cur:
+            cur.execute(query, (list(schemas),))
+            return {(row[0], row[1]): row[2] for row in cur.fetchall()}
 
     @staticmethod
     def get_indexes(conn, schema=None):
@@ -66,19 +151,17 @@ class DBObjects:
         """
         params = ()
         if schema:
-            query += " AND schemaname = %s"
-            params = (schema,)
+            condition, params = DBObjects._schema_condition('schemaname', schema)
+            query += condition
         query += " ORDER BY schema, table_name, name;"
         with conn.cursor() as cur:
             cur.execute(query, params)
-            indexes = cur.fetchall()
-            col_names = [desc[0] for desc in cur.description]
             # Apply normalization to the 'definition' field
             results = []
-            for row in indexes:
-                row_dict = dict(zip(col_names, row))
-                row_dict['definition'] = DBObjects.normalize_definition(row_dict['definition'])
-                results.append(row_dict)
+            for row in cur:
+                record = IndexRecord(*row)
+                record.definition = DBObjects.normalize_definition(record.definition)
+                results.append(record)
             return results
 
     @staticmethod
@@ -96,19 +179,17 @@ class DBObjects:
         """
         params = ()
         if schema:
-            query += " AND n.nspname = %s"
-            params = (schema,)
+            condition, params = DBObjects._schema_condition('n.nspname', schema)
+            query += condition
         query += " ORDER BY schema, name;"
         with conn.cursor() as cur:
             cur.execute(query, params)
-            functions = cur.fetchall()
-            col_names = [desc[0] for desc in cur.description]
             # Apply normalization to the 'definition' field
             results = []
-            for row in functions:
-                row_dict = dict(zip(col_names, row))
-                row_dict['definition'] = DBObjects.normalize_definition(row_dict['definition'])
-                results.append(row_dict)
+            for row in cur:
+                record = RoutineRecord(*row)
+                record.definition = DBObjects.normalize_definition(record.definition)
+                results.append(record)
             return results
 
     @staticmethod
@@ -126,19 +207,17 @@ class DBObjects:
         """
         params = ()
         if schema:
-            query += " AND n.nspname = %s"
-            params = (schema,)
+            condition, params = DBObjects._schema_condition('n.nspname', schema)
+            query += condition
         query += " ORDER BY schema, name;"
         with conn.cursor() as cur:
             cur.execute(query, params)
-            procedures = cur.fetchall()
-            col_names = [desc[0] for desc in cur.description]
             # Apply normalization to the 'definition' field
             results = []
-            for row in procedures:
-                row_dict = dict(zip(col_names, row))
-                row_dict['definition'] = DBObjects.normalize_definition(row_dict['definition'])
-                results.append(row_dict)
+            for row in cur:
+                record = RoutineRecord(*row)
+                record.definition = DBObjects.normalize_definition(record.definition)
+                results.append(record)
             return results
 
     @staticmethod
@@ -157,17 +236,15 @@ class DBObjects:
         """
         params = ()
         if schema:
-            query += " AND n.nspname = %s"
-            params = (schema,)
+            condition, params = DBObjects._schema_condition('n.nspname', schema)
+            query += condition
         query += " ORDER BY schema, table_name, name;"
         with conn.cursor() as cur:
             cur.execute(query, params)
-            triggers = cur.fetchall()
-            col_names = [desc[0] for desc in cur.description]
             # Apply normalization to the 'definition' field
             results = []
-            for row in triggers:
-                row_dict = dict(zip(col_names, row))
-                row_dict['definition'] = DBObjects.normalize_definition(row_dict['definition'])
-                results.append(row_dict)
+            for row in cur:
+                record = TriggerRecord(*row)
+                record.definition = DBObjects.normalize_definition(record.definition)
+                results.append(record)
             return results
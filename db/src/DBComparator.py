@@ -11,6 +11,18 @@ except ImportError:
 from db.schemas.db_objects import DBObjects
 
 
+# Keys identifying an object of each type across both databases
+OBJECT_IDENTIFIER_KEYS = {
+    'table': ['schema', 'name'],
+    'column': ['schema', 'table_name', 'column_name'],
+    'index': ['schema', 'table_name', 'name'],
+    'function': ['schema', 'name', 'arguments'],
+    'procedure': ['schema', 'name', 'arguments'],
+    'trigger': ['schema', 'table_name', 'name'],
+    'distribution': ['schema', 'table_name', 'column_name'],
+}
+
+
 class Comparator(ABC):
     @abstractmethod
     def compare_objects(self):
@@ -43,6 +55,11 @@ def _write_differences_to_csv(differences, object_type, identifier_keys, output_
         for field in ['data_type', 'is_nullable', 'column_default']:
             if field not in additional_columns:
                 additional_columns.append(field)
+    elif object_type == 'distribution':
+        for field in ['data_type', 'sample_rows', 'null_fraction', 'distinct_estimate', 'distinct_ratio', 'min',
+                      'max', 'histogram', 'reasons']:
+            if field not in additional_columns:
+                additional_columns.append(field)
 
     # Remove duplicates from additional_columns
     additional_columns = list(dict.fromkeys(additional_columns))
@@ -61,6 +78,14 @@ def _write_differences_to_csv(differences, object_type, identifier_keys, output_
         'data_type': 'type_donnees',
         'is_nullable': 'est_nullable',
         'column_default': 'valeur_par_defaut',
+        'sample_rows': 'lignes_echantillon',
+        'null_fraction': 'fraction_nulls',
+        'distinct_estimate': 'estimation_distincts',
+        'distinct_ratio': 'ratio_distincts',
+        'min': 'min',
+        'max': 'max',
+        'histogram': 'histogramme',
+        'reasons': 'raisons',
         'name': 'nom',
         'table': 'table',
         'indexname': 'nom_index',
@@ -87,11 +112,19 @@ def _write_differences_to_csv(differences, object_type, identifier_keys, output_
 
 
 class DBObjectComparator(Comparator):
-    def __init__(self, db1_conn, db2_conn, schema: Any | str = None):
+    def __init__(self, db1_conn, db2_conn, schema: Any | str = None, fingerprint: bool = False,
+                 write_csv: bool = True):
         self.db1_conn = db1_conn
         self.db2_conn = db2_conn
+        # A single schema name, a list of schema names, or None for all schemas
         self.schema = schema
+        # Compare schema/table fingerprints first and only fetch columns of differing tables
+        self.fingerprint = fingerprint
+        # Disabled when differences are merged and written by the caller (e.g. sharded comparison)
+        self.write_csv = write_csv
         self.output_dir = output_dir
+        # Differences collected per object type during the last comparison
+        self.differences = {}
 
     def compare_schema_objects(self):
         """Compare objects within the specified schema in both databases."""
@@ -101,17 +134,20 @@ class DBObjectComparator(Comparator):
         self._compare_objects_generic(
             objects1=tables1,
             objects2=tables2,
-            identifier_keys=['schema', 'name'],
+            identifier_keys=OBJECT_IDENTIFIER_KEYS['table'],
             object_type='table'
         )
 
         # Compare columns
-        columns1 = DBObjects.get_columns(self.db1_conn, self.schema)
-        columns2 = DBObjects.get_columns(self.db2_conn, self.schema)
+        if self.fingerprint:
+            columns1, columns2 = self._get_columns_by_fingerprint()
+        else:
+            columns1 = DBObjects.get_columns(self.db1_conn, self.schema)
+            columns2 = DBObjects.get_columns(self.db2_conn, self.schema)
         self._compare_objects_generic(
             objects1=columns1,
             objects2=columns2,
-            identifier_keys=['schema', 'table_name', 'column_name'],
+            identifier_keys=OBJECT_IDENTIFIER_KEYS['column'],
             object_type='column'
         )
 
@@ -121,7 +157,7 @@ class DBObjectComparator(Comparator):
         self._compare_objects_generic(
             objects1=indexes1,
             objects2=indexes2,
-            identifier_keys=['schema', 'table_name', 'name'],
+            identifier_keys=OBJECT_IDENTIFIER_KEYS['index'],
             object_type='index'
         )
 
@@ -131,7 +167,7 @@ class DBObjectComparator(Comparator):
         self._compare_objects_generic(
             objects1=functions1,
             objects2=functions2,
-            identifier_keys=['schema', 'name', 'arguments'],
+            identifier_keys=OBJECT_IDENTIFIER_KEYS['function'],
             object_type='function'
         )
 
@@ -141,7 +177,7 @@ class DBObjectComparator(Comparator):
         self._compare_objects_generic(
             objects1=procedures1,
             objects2=procedures2,
-            identifier_keys=['schema', 'name', 'arguments'],
+            identifier_keys=OBJECT_IDENTIFIER_KEYS['procedure'],
             object_type='procedure'
         )
 
@@ -151,14 +187,33 @@ class DBObjectComparator(Comparator):
         self._compare_objects_generic(
             objects1=triggers1,
             objects2=triggers2,
-            identifier_keys=['schema', 'table_name', 'name'],
+            identifier_keys=OBJECT_IDENTIFIER_KEYS['trigger'],
             object_type='trigger'
         )
 
     def compare_objects(self):
         """Implement the required method from the Comparator interface."""
+        self.differences = {}
         self.compare_schema_objects()
 
+    def _get_columns_by_fingerprint(self):
+        """Fetch column details only for tables whose schema and table fingerprints differ."""
+        schemas1 = DBObjects.get_schema_fingerprints(self.db1_conn, self.schema)
+        schemas2 = DBObjects.get_schema_fingerprints(self.db2_conn, self.schema)
+        changed_schemas = {s for s in schemas1.keys() | schemas2.keys() if schemas1.get(s) != schemas2.get(s)}
+        if not changed_schemas:
+            return [], []
+
+        tables1 = DBObjects.get_table_fingerprints(self.db1_conn, sorted(changed_schemas))
+        tables2 = DBObjects.get_table_fingerprints(self.db2_conn, sorted(changed_schemas))
+        changed_tables = sorted(t for t in tables1.keys() | tables2.keys() if tables1.get(t) != tables2.get(t))
+        if not changed_tables:
+            return [], []
+
+        columns1 = DBObjects.get_columns(self.db1_conn, self.schema, tables=changed_tables)
+        columns2 = DBObjects.get_columns(self.db2_conn, self.schema, tables=changed_tables)
+        return columns1, columns2
+
     def _compare_objects_generic(self, objects1, objects2, identifier_keys, object_type):
         """Generic method to compare objects and collect differences."""
         dict1 = {tuple(obj[k] for k in identifier_keys): obj for obj in objects1}
@@ -274,7 +329,8 @@ class DBObjectComparator(Comparator):
                 seen.add(diff_tuple)
                 unique_differences.append(diff)
         differences = unique_differences
+        self.differences[object_type] = differences
 
         # Write differences to CSV
-        if differences:
+        if differences and self.write_csv:
             _write_differences_to_csv(differences, object_type, identifier_keys, self.output_dir)
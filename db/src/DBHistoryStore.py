@@ -0,0 +1,190 @@
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+
+def _object_identity(diff):
+    """Build a stable identity string for a difference (schema.table.name(arguments))."""
+    parts = [str(diff[key]) for key in ('schema', 'table_name', 'nom', 'column_name') if diff.get(key)]
+    identity = '.'.join(parts)
+    if diff.get('arguments'):
+        identity += f"({diff['arguments']})"
+    return identity
+
+
+class RunHistoryStore:
+    """Append-only SQLite store of comparison runs and their differences."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_at TEXT NOT NULL,
+        db1 TEXT,
+        db2 TEXT,
+        schema TEXT,
+        difference_count INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS differences (
+        difference_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL REFERENCES runs(run_id),
+        object_type TEXT NOT NULL,
+        identity TEXT NOT NULL,
+        etat TEXT,
+        source TEXT,
+        details TEXT
+    );
+    -- Distinct drifting objects per run and object type, filled by record_run
+    CREATE TABLE IF NOT EXISTS run_summary (
+        run_id INTEGER NOT NULL REFERENCES runs(run_id),
+        object_type TEXT NOT NULL,
+        object_count INTEGER NOT NULL,
+        PRIMARY KEY (run_id, object_type)
+    ) WITHOUT ROWID;
+    -- First/last sighting of each drifting object, upserted by record_run
+    CREATE TABLE IF NOT EXISTS object_history (
+        object_type TEXT NOT NULL,
+        identity TEXT NOT NULL,
+        first_run_at TEXT NOT NULL,
+        last_run_at TEXT NOT NULL,
+        run_count INTEGER NOT NULL,
+        PRIMARY KEY (object_type, identity)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_runs_run_at ON runs (run_at);
+    CREATE INDEX IF NOT EXISTS idx_differences_identity ON differences (object_type, identity, run_id);
+    CREATE INDEX IF NOT EXISTS idx_differences_type_run_identity ON differences (object_type, run_id, identity);
+    CREATE INDEX IF NOT EXISTS idx_differences_run ON differences (run_id);
+    CREATE INDEX IF NOT EXISTS idx_object_history_first_seen ON object_history (object_type, first_run_at);
+    """
+
+    # Rebuild the summary tables from `differences` for stores written before they existed
+    _BACKFILL = """
+    INSERT INTO run_summary (run_id, object_type, object_count)
+    SELECT run_id, object_type, COUNT(DISTINCT identity)
+    FROM differences
+    GROUP BY run_id, object_type;
+    INSERT INTO object_history (object_type, identity, first_run_at, last_run_at, run_count)
+    SELECT d.object_type, d.identity, MIN(r.run_at), MAX(r.run_at), COUNT(DISTINCT d.run_id)
+    FROM differences d
+         JOIN runs r ON r.run_id = d.run_id
+    GROUP BY d.object_type, d.identity;
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(self._SCHEMA)
+        if (self.conn.execute("SELECT 1 FROM differences LIMIT 1").fetchone()
+                and not self.conn.execute("SELECT 1 FROM run_summary LIMIT 1").fetchone()):
+            with self.conn:
+                for statement in self._BACKFILL.split(';'):
+                    if statement.strip():
+                        self.conn.execute(statement)
+
+    def record_run(self, differences, db1=None, db2=None, schema=None, run_at=None):
+        """Record one run and all its differences in a single transaction.
+
+        `differences` maps an object type to the list of difference dicts
+        produced by the comparator. Returns the new run id.
+        """
+        run_at = run_at or datetime.now(timezone.utc).isoformat(timespec='seconds')
+        rows = []
+        identities = {}
+        for object_type, diffs in differences.items():
+            for diff in diffs:
+                identity = _object_identity(diff)
+                identities.setdefault(object_type, set()).add(identity)
+                rows.append((
+                    object_type,
+                    identity,
+                    diff.get('Etat', ''),
+                    diff.get('source', ''),
+                    json.dumps(diff, default=str, sort_keys=True),
+                ))
+
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (run_at, db1, db2, schema, difference_count) VALUES (?, ?, ?, ?, ?)",
+                (run_at, db1, db2, schema, len(rows))
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO differences (run_id, object_type, identity, etat, source, details) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id,) + row for row in rows]
+            )
+            self.conn.executemany(
+                "INSERT INTO run_summary (run_id, object_type, object_count) VALUES (?, ?, ?)",
+                [(run_id, object_type, len(ids)) for object_type, ids in identities.items()]
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO object_history (object_type, identity, first_run_at, last_run_at, run_count)
+                VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT (object_type, identity) DO UPDATE SET
+                    first_run_at = min(first_run_at, excluded.first_run_at),
+                    last_run_at = max(last_run_at, excluded.last_run_at),
+                    run_count = run_count + 1
+                """,
+                [(object_type, identity, run_at, run_at)
+                 for object_type, ids in identities.items() for identity in ids]
+            )
+        return run_id
+
+    def get_runs(self, limit=None):
+        """Return recorded runs, most recent first."""
+        query = "SELECT run_id, run_at, db1, db2, schema, difference_count FROM runs ORDER BY run_at DESC, run_id DESC"
+        params = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        cur = self.conn.execute(query, params)
+        col_names = [desc[0] for desc in cur.description]
+        return [dict(zip(col_names, row)) for row in cur.fetchall()]
+
+    def get_drift_over_time(self, object_type=None):
+        """Return the number of distinct drifting objects per run, oldest first."""
+        if object_type:
+            query = """
+            SELECT r.run_id, r.run_at, COALESCE(s.object_count, 0) AS object_count
+            FROM runs r
+                 LEFT JOIN run_summary s ON s.run_id = r.run_id AND s.object_type = ?
+            ORDER BY r.run_at, r.run_id;
+            """
+            params = (object_type,)
+        else:
+            query = """
+            SELECT r.run_id, r.run_at, COALESCE(SUM(s.object_count), 0) AS object_count
+            FROM runs r
+                 LEFT JOIN run_summary s ON s.run_id = r.run_id
+            GROUP BY r.run_id, r.run_at
+            ORDER BY r.run_at, r.run_id;
+            """
+            params = ()
+        cur = self.conn.execute(query, params)
+        col_names = [desc[0] for desc in cur.description]
+        return [dict(zip(col_names, row)) for row in cur.fetchall()]
+
+    def get_first_last_seen(self, object_type, identity=None):
+        """Return first-seen / last-seen run times for drifting objects of a type."""
+        query = """
+        SELECT identity, first_run_at AS first_seen, last_run_at AS last_seen, run_count
+        FROM object_history
+        WHERE object_type = ?
+        """
+        params = (object_type,)
+        if identity:
+            query += " AND identity = ?"
+            params += (identity,)
+        query += " ORDER BY first_seen, identity;"
+        cur = self.conn.execute(query, params)
+        col_names = [desc[0] for desc in cur.description]
+        return [dict(zip(col_names, row)) for row in cur.fetchall()]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
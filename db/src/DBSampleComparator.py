@@ -0,0 +1,307 @@
+import bisect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+from psycopg2 import sql
+
+from db.schemas.db_objects import DBObjects
+from db.src.DBComparator import Comparator, OBJECT_IDENTIFIER_KEYS, _write_differences_to_csv, output_dir
+from db.src.DBConnectionHandler import DbConnectionHandler
+
+# Upper bound on TABLESAMPLE SYSTEM percent, to keep sampling cheap on large tables
+MAX_SAMPLE_PERCENT = 10.0
+
+# Quantiles computed server-side as a histogram sketch
+HISTOGRAM_QUANTILES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+NUMERIC_TYPES = {'smallint', 'integer', 'bigint', 'numeric', 'real', 'double precision'}
+
+# Sketched as numbers with extract(epoch from ...) so they use the range-normalised comparison
+TEMPORAL_TYPES = {
+    'date', 'interval', 'timestamp without time zone', 'timestamp with time zone', 'time without time zone',
+}
+
+TEXT_TYPES = {'text', 'character varying', 'character'}
+
+# Types supporting min/max, count(DISTINCT) and percentiles
+ORDERED_TYPES = NUMERIC_TYPES | TEMPORAL_TYPES | TEXT_TYPES
+
+
+def _rank_fraction(values, value):
+    """Fraction of sorted `values` below `value`, counting ties as half."""
+    return (bisect.bisect_left(values, value) + bisect.bisect_right(values, value)) / 2 / len(values)
+
+
+def histogram_divergence(histogram1, histogram2, numeric=False):
+    """Return a 0..1 divergence between two quantile sketches.
+
+    Numeric sketches use the largest quantile shift relative to the overall range.
+    Other sketches are compared by rank: each quantile of one side is placed among
+    the quantiles of the other, and the largest gap from its expected rank is
+    returned, so samples of the same distribution stay close even when no quantile
+    value is shared.
+    """
+    if not histogram1 or not histogram2 or len(histogram1) != len(histogram2):
+        return 0.0
+    if numeric:
+        values1 = [float(v) for v in histogram1]
+        values2 = [float(v) for v in histogram2]
+        value_range = max(values1 + values2) - min(values1 + values2)
+        if value_range == 0:
+            return 0.0
+        return max(abs(v1 - v2) for v1, v2 in zip(values1, values2)) / value_range
+    count = len(histogram1)
+    return max(
+        abs(_rank_fraction(other, value) - (i + 0.5) / count)
+        for sketch, other in ((histogram1, histogram2), (histogram2, histogram1))
+        for i, value in enumerate(sketch)
+    )
+
+
+def estimate_distinct(sample_rows, distinct, singletons, population_rows):
+    """Scale the sample distinct count up to the population (Haas-Stokes Duj1 estimator).
+
+    `singletons` is the number of values seen exactly once in the sample. Unlike the raw
+    sample ratio, the estimate does not depend on how many rows were sampled.
+    """
+    if not sample_rows or not distinct:
+        return 0
+    population_rows = max(population_rows, sample_rows)
+    denominator = sample_rows - singletons + singletons * sample_rows / population_rows
+    if denominator <= 0:
+        return population_rows
+    return min(population_rows, sample_rows * distinct / denominator)
+
+
+def build_profile_query(schema, table_name, columns, sample_percent, seed=0):
+    """Build one sampled query profiling all columns of a table.
+
+    The sample is taken once in a CTE, so the singleton counts used by the
+    distinct estimate are computed on the same rows as the other statistics.
+    """
+    expressions = [
+        sql.SQL("count(*)"),
+        # Planner row estimate, used to extrapolate distinct counts to the whole table
+        sql.SQL(
+            "(SELECT reltuples FROM pg_catalog.pg_class "
+            "WHERE oid = to_regclass(quote_ident({schema}) || '.' || quote_ident({table})))::float8"
+        ).format(schema=sql.Literal(schema), table=sql.Literal(table_name)),
+    ]
+    for column in columns:
+        identifier = sql.Identifier(column.column_name)
+        expressions.append(sql.SQL("count({c})").format(c=identifier))
+        if column.data_type in ORDERED_TYPES:
+            expressions.append(sql.SQL("count(DISTINCT {c})").format(c=identifier))
+            expressions.append(sql.SQL(
+                "(SELECT count(*) FROM (SELECT 1 FROM sample WHERE {c} IS NOT NULL GROUP BY {c} "
+                "HAVING count(*) = 1) singletons)"
+            ).format(c=identifier))
+            expressions.append(sql.SQL("min({c})::text").format(c=identifier))
+            expressions.append(sql.SQL("max({c})::text").format(c=identifier))
+            if column.data_type in TEMPORAL_TYPES:
+                order_by = sql.SQL("extract(epoch from {c})").format(c=identifier)
+            elif column.data_type in TEXT_TYPES:
+                # Byte order, so the client-side rank comparison sorts the same way as the server
+                order_by = sql.SQL('{c} COLLATE "C"').format(c=identifier)
+            else:
+                order_by = identifier
+            expressions.append(sql.SQL(
+                "(percentile_disc({q}::float8[]) WITHIN GROUP (ORDER BY {o}))::text[]"
+            ).format(q=sql.Literal(HISTOGRAM_QUANTILES), o=order_by))
+    return sql.SQL(
+        "WITH sample AS (SELECT {columns} FROM {table} TABLESAMPLE SYSTEM ({percent}) REPEATABLE ({seed})) "
+        "SELECT {expressions} FROM sample"
+    ).format(
+        columns=sql.SQL(', ').join(sql.Identifier(column.column_name) for column in columns),
+        expressions=sql.SQL(', ').join(expressions),
+        table=sql.Identifier(schema, table_name),
+        percent=sql.Literal(sample_percent),
+        seed=sql.Literal(seed),
+    )
+
+
+def parse_profile_row(row, columns, sample_percent=None):
+    """Turn a profile query row into {column_name: statistics}."""
+    values = iter(row)
+    sample_rows = next(values)
+    table_rows = next(values)
+    if not table_rows or table_rows <= 0:
+        # Never analyzed: extrapolate the table size from the sample
+        table_rows = sample_rows * 100 / sample_percent if sample_percent else sample_rows
+    profiles = {}
+    for column in columns:
+        non_null = next(values)
+        profile = {
+            'sample_rows': sample_rows,
+            'null_fraction': round(1 - non_null / sample_rows, 4) if sample_rows else None,
+            'distinct_estimate': None,
+            'distinct_ratio': None,
+            'min': None,
+            'max': None,
+            'histogram': None,
+        }
+        if column.data_type in ORDERED_TYPES:
+            distinct = next(values)
+            singletons = next(values)
+            if non_null:
+                non_null_rows = table_rows * non_null / sample_rows
+                estimate = estimate_distinct(non_null, distinct, singletons, non_null_rows)
+                profile['distinct_estimate'] = round(estimate)
+                profile['distinct_ratio'] = round(estimate / max(non_null_rows, non_null), 4)
+            profile['min'] = next(values)
+            profile['max'] = next(values)
+            profile['histogram'] = next(values)
+        profiles[column.column_name] = profile
+    return profiles
+
+
+class DataDistributionComparator(Comparator):
+    """Compare per-column data distributions of tables present on both sides using TABLESAMPLE SYSTEM."""
+
+    def __init__(self, db1_name: str, db2_name: str, schema: str | None = None, sample_percent: float = 1.0,
+                 max_concurrent_queries: int = 4, null_threshold: float = 0.05, distinct_threshold: float = 0.2,
+                 histogram_threshold: float = 0.25, seed: int = 0):
+        if not 0 < sample_percent <= MAX_SAMPLE_PERCENT:
+            raise ValueError(f"sample_percent must be in (0, {MAX_SAMPLE_PERCENT}]")
+        if max_concurrent_queries < 1:
+            raise ValueError("max_concurrent_queries must be at least 1")
+        self.db1_name = db1_name
+        self.db2_name = db2_name
+        self.schema = schema
+        self.sample_percent = sample_percent
+        self.max_concurrent_queries = max_concurrent_queries
+        self.null_threshold = null_threshold
+        self.distinct_threshold = distinct_threshold
+        self.histogram_threshold = histogram_threshold
+        self.seed = seed
+        self.output_dir = output_dir
+        self.differences = {}
+        self._local = threading.local()
+        self._opened_connections = []
+        self._lock = threading.Lock()
+
+    def _get_connection(self, db_name):
+        """Return the calling worker thread's own connection to `db_name`."""
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        if db_name not in connections:
+            conn = DbConnectionHandler._connect_to_db(db_name)
+            if conn is None:
+                raise ConnectionError(f"Failed to connect to {db_name}")
+            # Sampling queries are read-only; autocommit avoids idle-in-transaction sessions
+            conn.autocommit = True
+            connections[db_name] = conn
+            with self._lock:
+                self._opened_connections.append(conn)
+        return connections[db_name]
+
+    def _get_shared_tables(self):
+        """Return {(schema, table_name): [ColumnRecord]} for columns present with the same type on both sides."""
+        db_handler = DbConnectionHandler(self.db1_name, self.db2_name)
+        connections = db_handler.get_connections()
+        try:
+            conn1 = connections.get(self.db1_name)
+            conn2 = connections.get(self.db2_name)
+            tables = ({(t.schema, t.name) for t in DBObjects.get_tables(conn1, self.schema)}
+                      & {(t.schema, t.name) for t in DBObjects.get_tables(conn2, self.schema)})
+            columns2 = {(c.schema, c.table_name, c.column_name): c.data_type
+                        for c in DBObjects.get_columns(conn2, self.schema)}
+            shared = {}
+            for column in DBObjects.get_columns(conn1, self.schema):
+                table = (column.schema, column.table_name)
+                key = (column.schema, column.table_name, column.column_name)
+                if table in tables and columns2.get(key) == column.data_type:
+                    shared.setdefault(table, []).append(column)
+            return shared
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+    def _profile_table(self, db_name, table, columns):
+        query = build_profile_query(table[0], table[1], columns, self.sample_percent, self.seed)
+        with self._get_connection(db_name).cursor() as cur:
+            cur.execute(query)
+            return parse_profile_row(cur.fetchone(), columns, self.sample_percent)
+
+    def _compare_column(self, column, profile1, profile2):
+        """Return the reasons the column distributions diverge (empty when similar or not comparable)."""
+        if not profile1['sample_rows'] or not profile2['sample_rows']:
+            return []
+        reasons = []
+        if abs(profile1['null_fraction'] - profile2['null_fraction']) > self.null_threshold:
+            reasons.append('null_fraction')
+        if (profile1['distinct_ratio'] is not None and profile2['distinct_ratio'] is not None
+                and abs(profile1['distinct_ratio'] - profile2['distinct_ratio']) > self.distinct_threshold):
+            reasons.append('distinct_ratio')
+        divergence = histogram_divergence(profile1['histogram'], profile2['histogram'],
+                                          numeric=column.data_type not in TEXT_TYPES)
+        if divergence > self.histogram_threshold:
+            reasons.append('histogram')
+        return reasons
+
+    def compare_objects(self):
+        """Profile every shared table on both sides within the concurrency budget and flag divergent columns."""
+        self.differences = {}
+        shared = self._get_shared_tables()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_queries) as executor:
+                futures = {
+                    table: (executor.submit(self._profile_table, self.db1_name, table, columns),
+                            executor.submit(self._profile_table, self.db2_name, table, columns))
+                    for table, columns in shared.items()
+                }
+                differences = []
+                for table, (future1, future2) in futures.items():
+                    errors = []
+                    profiles = {}
+                    for source, future in (('preprod', future1), ('prod', future2)):
+                        try:
+                            profiles[source] = future.result()
+                        except psycopg2.Error as e:
+                            # One unreadable table (missing privilege, cancelled query...) must not abort the run
+                            print(f"Failed to sample {table[0]}.{table[1]} on {source}. Reason: {e}")
+                            errors.append({
+                                'Type': 'distribution',
+                                'Etat': 'erreur',
+                                'source': source,
+                                'schema': table[0],
+                                'nom': '',
+                                'table_name': table[1],
+                                'reasons': f"error: {str(e).strip()}",
+                            })
+                    if errors:
+                        differences.extend(errors)
+                        continue
+                    profiles1 = profiles['preprod']
+                    profiles2 = profiles['prod']
+                    for column in shared[table]:
+                        profile1 = profiles1[column.column_name]
+                        profile2 = profiles2[column.column_name]
+                        reasons = self._compare_column(column, profile1, profile2)
+                        if not reasons:
+                            continue
+                        for source, profile in (('preprod', profile1), ('prod', profile2)):
+                            differences.append({
+                                'Type': 'distribution',
+                                'Etat': 'difference',
+                                'source': source,
+                                'schema': column.schema,
+                                'nom': '',
+                                'table_name': column.table_name,
+                                'column_name': column.column_name,
+                                'data_type': column.data_type,
+                                **profile,
+                                'reasons': ', '.join(reasons),
+                            })
+        finally:
+            for conn in self._opened_connections:
+                conn.close()
+            self._opened_connections = []
+            self._local = threading.local()
+
+        if differences:
+            self.differences['distribution'] = differences
+            _write_differences_to_csv(differences, 'distribution', OBJECT_IDENTIFIER_KEYS['distribution'],
+                                      self.output_dir)
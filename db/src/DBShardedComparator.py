@@ -0,0 +1,79 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from db.schemas.db_objects import DBObjects
+from db.src.DBComparator import (Comparator, DBObjectComparator, OBJECT_IDENTIFIER_KEYS,
+                                 _write_differences_to_csv, output_dir)
+from db.src.DBConnectionHandler import DbConnectionHandler
+
+
+def split_into_shards(schema_counts, shard_count):
+    """Split schemas into `shard_count` shards balanced by object count (largest first)."""
+    shards = [[] for _ in range(max(1, min(shard_count, len(schema_counts))))]
+    heap = [(0, i) for i in range(len(shards))]
+    for schema, count in sorted(schema_counts.items(), key=lambda item: (-item[1], item[0])):
+        load, i = heapq.heappop(heap)
+        shards[i].append(schema)
+        heapq.heappush(heap, (load + count, i))
+    return [sorted(shard) for shard in shards if shard]
+
+
+def _compare_shard(db1_name, db2_name, schemas, fingerprint=False):
+    """Worker entry point: compare a shard of schemas on its own connections."""
+    connections = DbConnectionHandler(db1_name, db2_name).get_connections()
+    try:
+        conn1 = connections.get(db1_name)
+        conn2 = connections.get(db2_name)
+        # One extraction per shard: the catalog getters filter on the whole list of schemas
+        comparator = DBObjectComparator(conn1, conn2, schema=schemas, fingerprint=fingerprint, write_csv=False)
+        comparator.compare_objects()
+        return comparator.differences
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+
+class ShardedDBObjectComparator(Comparator):
+    """Compare every schema in parallel worker processes, one shard of schemas per task."""
+
+    def __init__(self, db1_name: str, db2_name: str, workers: int | None = None, fingerprint: bool = False):
+        self.db1_name = db1_name
+        self.db2_name = db2_name
+        self.workers = workers or os.cpu_count() or 1
+        self.fingerprint = fingerprint
+        self.output_dir = output_dir
+        # Differences merged from all shards, per object type
+        self.differences = {}
+
+    def get_shards(self):
+        """List schemas on both sides and split them into balanced shards."""
+        db_handler = DbConnectionHandler(self.db1_name, self.db2_name)
+        connections = db_handler.get_connections()
+        try:
+            schema_counts = {}
+            for conn in connections.values():
+                for schema, count in DBObjects.get_schema_object_counts(conn).items():
+                    schema_counts[schema] = max(schema_counts.get(schema, 0), count)
+        finally:
+            for conn in connections.values():
+                conn.close()
+        return split_into_shards(schema_counts, self.workers)
+
+    def compare_objects(self):
+        """Run extraction and diff per shard in worker processes, then write one merged report."""
+        self.differences = {}
+        shards = self.get_shards()
+        with ProcessPoolExecutor(max_workers=max(1, len(shards))) as executor:
+            futures = [
+                executor.submit(_compare_shard, self.db1_name, self.db2_name, shard, self.fingerprint)
+                for shard in shards
+            ]
+            for future in futures:
+                for object_type, diffs in future.result().items():
+                    self.differences.setdefault(object_type, []).extend(diffs)
+
+        for object_type, differences in self.differences.items():
+            if differences:
+                _write_differences_to_csv(differences, object_type, OBJECT_IDENTIFIER_KEYS[object_type],
+                                          self.output_dir)
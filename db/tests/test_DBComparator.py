@@ -0,0 +1,49 @@
+from unittest.mock import patch, MagicMock
+from db.schemas.db_objects import DBObjects
+from db.src.DBComparator import DBObjectComparator
+
+
+@patch('db.src.DBComparator.DBObjects')
+def test_fingerprint_identical_schemas_skip_columns(mock_objects):
+    mock_objects.get_schema_fingerprints.return_value = {'public': 'abc'}
+
+    comparator = DBObjectComparator(MagicMock(), MagicMock(), fingerprint=True)
+    assert comparator._get_columns_by_fingerprint() == ([], [])
+
+    mock_objects.get_table_fingerprints.assert_not_called()
+    mock_objects.get_columns.assert_not_called()
+
+
+@patch('db.src.DBComparator.DBObjects')
+def test_fingerprint_fetches_only_differing_tables(mock_objects):
+    conn1, conn2 = MagicMock(), MagicMock()
+    mock_objects.get_schema_fingerprints.side_effect = [
+        {'public': 'abc', 'sales': 'same'},
+        {'public': 'abd', 'sales': 'same'},
+    ]
+    mock_objects.get_table_fingerprints.side_effect = [
+        {('public', 'orders'): 'h1', ('public', 'customers'): 'h2'},
+        {('public', 'orders'): 'h1', ('public', 'customers'): 'h3', ('public', 'items'): 'h4'},
+    ]
+    mock_objects.get_columns.return_value = []
+
+    comparator = DBObjectComparator(conn1, conn2, fingerprint=True)
+    comparator._get_columns_by_fingerprint()
+
+    mock_objects.get_table_fingerprints.assert_any_call(conn1, ['public'])
+    mock_objects.get_columns.assert_any_call(
+        conn1, None, tables=[('public', 'customers'), ('public', 'items')]
+    )
+    assert mock_objects.get_columns.call_count == 2
+
+
+def test_fingerprint_queries_are_collation_independent():
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchall.return_value = []
+
+    DBObjects.get_schema_fingerprints(conn)
+
+    query = cur.execute.call_args[0][0]
+    assert 'ORDER BY column_name::text COLLATE "C"' in query
+    assert 'ORDER BY table_name::text COLLATE "C"' in query
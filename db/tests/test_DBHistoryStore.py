@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from db.src.DBHistoryStore import RunHistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = RunHistoryStore(str(tmp_path / 'history.sqlite3'))
+    yield history
+    history.close()
+
+
+def _index_diff(name, source='prod'):
+    return {'Type': 'index', 'Etat': 'unique', 'source': source, 'schema': 'public',
+            'nom': name, 'table_name': 'orders', 'definition': 'create index ...'}
+
+
+def test_record_run(store):
+    run_id = store.record_run({'index': [_index_diff('idx_a')]}, db1='PG-TEST', db2='PG-DWH', schema='public')
+
+    runs = store.get_runs()
+    assert len(runs) == 1
+    assert runs[0]['run_id'] == run_id
+    assert runs[0]['difference_count'] == 1
+    assert runs[0]['db1'] == 'PG-TEST'
+
+
+def test_first_last_seen(store):
+    store.record_run({'index': []}, run_at='2024-01-01T00:00:00')
+    store.record_run({'index': [_index_diff('idx_a')]}, run_at='2024-01-02T00:00:00')
+    store.record_run({'index': [_index_diff('idx_a'), _index_diff('idx_b')]}, run_at='2024-01-03T00:00:00')
+
+    seen = store.get_first_last_seen('index', 'public.orders.idx_a')
+    assert seen == [{'identity': 'public.orders.idx_a', 'first_seen': '2024-01-02T00:00:00',
+                     'last_seen': '2024-01-03T00:00:00', 'run_count': 2}]
+    assert len(store.get_first_last_seen('index')) == 2
+
+
+def test_drift_over_time(store):
+    store.record_run({'index': []}, run_at='2024-01-01T00:00:00')
+    store.record_run({'index': [_index_diff('idx_a', 'prod'), _index_diff('idx_a', 'preprod')]},
+                     run_at='2024-01-02T00:00:00')
+
+    drift = store.get_drift_over_time('index')
+    assert [row['object_count'] for row in drift] == [0, 1]
+    assert store.get_drift_over_time('table')[1]['object_count'] == 0
+    assert [row['object_count'] for row in store.get_drift_over_time()] == [0, 1]
+
+
+def test_context_manager_closes(tmp_path):
+    with RunHistoryStore(str(tmp_path / 'history.sqlite3')) as history:
+        history.record_run({})
+    with pytest.raises(Exception):
+        history.get_runs()
+
+
+def test_drift_counts_types_separately(store):
+    table = {'Type': 'table', 'Etat': 'unique', 'source': 'prod', 'schema': 'public', 'nom': 'orders'}
+    function = {'Type': 'function', 'Etat': 'unique', 'source': 'prod', 'schema': 'public', 'nom': 'orders',
+                'arguments': ''}
+    store.record_run({'table': [table], 'function': [function]})
+
+    assert store.get_drift_over_time()[0]['object_count'] == 2
+
+
+def test_backfill_summaries(tmp_path):
+    path = str(tmp_path / 'history.sqlite3')
+    with RunHistoryStore(path) as history:
+        history.record_run({'index': [_index_diff('idx_a')]}, run_at='2024-01-01T00:00:00')
+        history.conn.execute("DELETE FROM run_summary")
+        history.conn.execute("DELETE FROM object_history")
+        history.conn.commit()
+
+    with RunHistoryStore(path) as history:
+        assert history.get_drift_over_time('index')[0]['object_count'] == 1
+        assert history.get_first_last_seen('index')[0]['run_count'] == 1
+
+
+def test_queries_fast_across_thousands_of_runs():
+    # In-memory store: only query time is measured, not per-commit fsync while seeding
+    store = RunHistoryStore(':memory:')
+    for run in range(3000):
+        diffs = [_index_diff(f'idx_{(run + i) % 500}') for i in range(40)]
+        store.record_run({'index': diffs, 'table': diffs[:5]}, run_at=f'2024-01-01T00:00:{run:05d}')
+
+    start = time.perf_counter()
+    drift = store.get_drift_over_time('index')
+    drift_all = store.get_drift_over_time()
+    seen = store.get_first_last_seen('index')
+    seen_one = store.get_first_last_seen('index', 'public.orders.idx_7')
+    elapsed = time.perf_counter() - start
+
+    assert len(drift) == len(drift_all) == 3000
+    assert drift[0]['object_count'] == 40
+    assert len(seen) == 500
+    assert seen_one[0]['run_count'] == 240
+    assert elapsed < 0.1
+    store.close()
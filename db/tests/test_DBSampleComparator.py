@@ -0,0 +1,139 @@
+import math
+import random
+
+import psycopg2
+import pytest
+from unittest.mock import patch, MagicMock
+from db.schemas.catalog_records import ColumnRecord
+from db.src.DBSampleComparator import (HISTOGRAM_QUANTILES, DataDistributionComparator, build_profile_query,
+                                       estimate_distinct, histogram_divergence, parse_profile_row)
+
+COLUMNS = [
+    ColumnRecord('public', 'orders', 'amount', 'numeric', 'YES', None),
+    ColumnRecord('public', 'orders', 'payload', 'jsonb', 'YES', None),
+]
+
+
+def test_sample_percent_budget():
+    with pytest.raises(ValueError):
+        DataDistributionComparator('PG-TEST', 'PG-DWH', sample_percent=50)
+    with pytest.raises(ValueError):
+        DataDistributionComparator('PG-TEST', 'PG-DWH', max_concurrent_queries=0)
+
+
+def test_build_profile_query():
+    query = repr(build_profile_query('public', 'orders', COLUMNS, 1.5))
+    assert 'TABLESAMPLE SYSTEM' in query
+    assert "Identifier('public', 'orders')" in query
+    assert query.count('percentile_disc') == 1
+    assert 'HAVING count(*) = 1' in query
+
+
+def test_build_profile_query_temporal_and_text_order():
+    columns = [ColumnRecord('public', 'orders', 'created_at', 'timestamp with time zone', 'YES', None),
+               ColumnRecord('public', 'orders', 'reference', 'text', 'YES', None)]
+    query = repr(build_profile_query('public', 'orders', columns, 1.5))
+    assert 'extract(epoch from ' in query
+    assert 'COLLATE "C"' in query
+
+
+def test_parse_profile_row():
+    # Sample covering the whole table, so the distinct estimate equals the sample count
+    row = (200, 200.0, 150, 30, 10, '1', '99', ['10', '20'], 100)
+    profiles = parse_profile_row(row, COLUMNS)
+
+    assert profiles['amount']['null_fraction'] == 0.25
+    assert profiles['amount']['distinct_estimate'] == 30
+    assert profiles['amount']['distinct_ratio'] == 0.2
+    assert profiles['amount']['histogram'] == ['10', '20']
+    assert profiles['payload']['null_fraction'] == 0.5
+    assert profiles['payload']['distinct_ratio'] is None
+
+
+def _deciles(sample):
+    """Quantiles as computed by percentile_disc."""
+    ordered = sorted(sample)
+    return [str(ordered[math.ceil(q * len(ordered)) - 1]) for q in HISTOGRAM_QUANTILES]
+
+
+def test_histogram_divergence():
+    assert histogram_divergence(['1', '2', '3'], ['1', '2', '3'], numeric=True) == 0.0
+    assert histogram_divergence(['0', '5', '10'], ['0', '5', '20'], numeric=True) == 0.5
+    assert histogram_divergence(['a', 'b', 'c'], ['a', 'b', 'c']) < 0.25
+    assert histogram_divergence(['a', 'b', 'c'], ['x', 'y', 'z']) > 0.25
+
+
+def test_histogram_same_distribution_not_flagged():
+    rng = random.Random(42)
+    # Timestamps sketched as epoch seconds, as returned by extract(epoch from ...)
+    epochs1 = [1.7e9 + rng.uniform(0, 3e7) for _ in range(1000)]
+    epochs2 = [1.7e9 + rng.uniform(0, 3e7) for _ in range(1000)]
+    assert histogram_divergence(_deciles(epochs1), _deciles(epochs2), numeric=True) < 0.25
+
+    # High-cardinality text: no decile value is shared between the two samples
+    text1 = [f"{rng.getrandbits(64):016x}" for _ in range(1000)]
+    text2 = [f"{rng.getrandbits(64):016x}" for _ in range(1000)]
+    assert not set(_deciles(text1)) & set(_deciles(text2))
+    assert histogram_divergence(_deciles(text1), _deciles(text2)) < 0.25
+
+    # A shifted text distribution is still flagged
+    text3 = [f"f{value[1:]}" for value in text2]
+    assert histogram_divergence(_deciles(text1), _deciles(text3)) > 0.25
+
+
+def _sample_stats(sample):
+    counts = {}
+    for value in sample:
+        counts[value] = counts.get(value, 0) + 1
+    return len(sample), len(counts), sum(1 for count in counts.values() if count == 1)
+
+
+def test_distinct_estimate_independent_of_sample_size():
+    rng = random.Random(7)
+    # 500k-row table over 50k distinct values, sampled at two very different sizes
+    population_rows, population_distinct = 500_000, 50_000
+    large = [rng.randrange(population_distinct) for _ in range(50_000)]
+    small = [rng.randrange(population_distinct) for _ in range(5_000)]
+
+    n1, d1, f1 = _sample_stats(large)
+    n2, d2, f2 = _sample_stats(small)
+    # The raw sample ratios differ well beyond the default 0.2 threshold
+    assert d2 / n2 - d1 / n1 > 0.2
+
+    ratio1 = estimate_distinct(n1, d1, f1, population_rows) / population_rows
+    ratio2 = estimate_distinct(n2, d2, f2, population_rows) / population_rows
+    assert abs(ratio1 - ratio2) < 0.05
+
+    comparator = DataDistributionComparator('PG-TEST', 'PG-DWH')
+    profile1 = {'sample_rows': n1, 'null_fraction': 0.0, 'distinct_ratio': ratio1, 'histogram': None}
+    profile2 = {'sample_rows': n2, 'null_fraction': 0.0, 'distinct_ratio': ratio2, 'histogram': None}
+    assert comparator._compare_column(COLUMNS[0], profile1, profile2) == []
+
+
+def test_compare_column_flags_null_fraction():
+    comparator = DataDistributionComparator('PG-TEST', 'PG-DWH')
+    profile1 = {'sample_rows': 100, 'null_fraction': 0.0, 'distinct_ratio': 0.5, 'histogram': ['1', '2']}
+    profile2 = {'sample_rows': 100, 'null_fraction': 0.4, 'distinct_ratio': 0.5, 'histogram': ['1', '2']}
+
+    assert comparator._compare_column(COLUMNS[0], profile1, profile2) == ['null_fraction']
+    assert comparator._compare_column(COLUMNS[0], profile1, dict(profile1, sample_rows=0)) == []
+
+
+@patch('db.src.DBSampleComparator._write_differences_to_csv')
+def test_failed_table_is_reported_not_raised(mock_write):
+    comparator = DataDistributionComparator('PG-TEST', 'PG-DWH')
+    comparator._get_shared_tables = MagicMock(return_value={('public', 'orders'): COLUMNS[:1],
+                                                            ('public', 'secret'): COLUMNS[:1]})
+    profile = {'amount': {'sample_rows': 100, 'null_fraction': 0.0, 'distinct_ratio': 0.5, 'histogram': None}}
+
+    def profile_table(db_name, table, columns):
+        if table[1] == 'secret' and db_name == 'PG-DWH':
+            raise psycopg2.errors.InsufficientPrivilege("permission denied for table secret")
+        return profile
+
+    comparator._profile_table = profile_table
+    comparator.compare_objects()
+
+    rows = comparator.differences['distribution']
+    assert [(row['table_name'], row['source'], row['Etat']) for row in rows] == [('secret', 'prod', 'erreur')]
+    assert rows[0]['reasons'] == 'error: permission denied for table secret'
@@ -0,0 +1,45 @@
+from unittest.mock import patch, MagicMock
+from db.schemas.db_objects import DBObjects
+from db.src.DBShardedComparator import split_into_shards, _compare_shard
+
+
+def test_split_into_shards_balanced():
+    counts = {'tenant_a': 100, 'tenant_b': 60, 'tenant_c': 50, 'tenant_d': 10}
+    shards = split_into_shards(counts, 2)
+
+    assert sorted(sum(shards, [])) == sorted(counts)
+    loads = sorted(sum(counts[s] for s in shard) for shard in shards)
+    assert loads == [110, 110]
+
+
+def test_split_into_shards_more_workers_than_schemas():
+    assert split_into_shards({'public': 5}, 8) == [['public']]
+    assert split_into_shards({}, 4) == []
+
+
+@patch('db.src.DBShardedComparator.DBObjectComparator')
+@patch('db.src.DBShardedComparator.DbConnectionHandler')
+def test_compare_shard_single_extraction_and_closes(mock_handler, mock_comparator):
+    conn1, conn2 = MagicMock(), MagicMock()
+    mock_handler.return_value.get_connections.return_value = {'PG-TEST': conn1, 'PG-DWH': conn2}
+    mock_comparator.return_value.differences = {'table': [{'nom': 'orders'}]}
+
+    differences = _compare_shard('PG-TEST', 'PG-DWH', ['tenant_a', 'tenant_b'])
+
+    assert differences == {'table': [{'nom': 'orders'}]}
+    mock_comparator.assert_called_once_with(conn1, conn2, schema=['tenant_a', 'tenant_b'], fingerprint=False,
+                                            write_csv=False)
+    conn1.close.assert_called_once()
+    conn2.close.assert_called_once()
+
+
+def test_getters_filter_on_schema_list():
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.__iter__.return_value = iter([])
+
+    DBObjects.get_tables(conn, ['tenant_a', 'tenant_b'])
+
+    query, params = cur.execute.call_args[0]
+    assert 'table_schema = ANY(%s)' in query
+    assert params == (['tenant_a', 'tenant_b'],)
@@ -0,0 +1,49 @@
+from unittest.mock import MagicMock
+from db.schemas.catalog_records import ColumnRecord, IndexRecord, TableRecord
+from db.schemas.db_objects import DBObjects
+
+
+def test_record_dict_interface():
+    record = IndexRecord('public', 'orders', 'idx_orders', 'create index ...')
+
+    assert record['table_name'] == 'orders'
+    assert record.get('name') == 'idx_orders'
+    assert record.get('column_name', '') == ''
+    assert 'definition' in record
+    assert 'data_type' not in record
+    assert dict(record.items()) == {'schema': 'public', 'table_name': 'orders',
+                                    'name': 'idx_orders', 'definition': 'create index ...'}
+
+
+def test_record_equality():
+    assert TableRecord('public', 'orders') == TableRecord('public', 'orders')
+    assert TableRecord('public', 'orders') != TableRecord('public', 'customers')
+
+
+def test_record_interns_repeated_names():
+    schema1 = ''.join(['ten', 'ant_a'])
+    schema2 = ''.join(['tena', 'nt_a'])
+    assert schema1 is not schema2
+
+    record1 = ColumnRecord(schema1, 'orders', 'id', 'integer', 'NO', None)
+    record2 = ColumnRecord(schema2, 'orders', 'id', 'integer', 'NO', None)
+    assert record1.schema is record2.schema
+    assert record1.column_default is None
+
+
+def test_get_columns_uses_server_side_cursor():
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.__iter__.return_value = iter([('public', 'orders', 'id', 'integer', 'NO', None)])
+
+    columns = DBObjects.get_columns(conn, 'public')
+
+    assert conn.cursor.call_args.kwargs['name'] == 'get_columns'
+    assert cur.itersize == DBObjects.COLUMNS_FETCH_SIZE
+    assert columns == [ColumnRecord('public', 'orders', 'id', 'integer', 'NO', None)]
+
+
+def test_column_default_not_interned():
+    default = ''.join(["nextval('orders_id_seq'", "::regclass)"])
+    record = ColumnRecord('public', 'orders', 'id', 'integer', 'NO', default)
+    assert record.column_default is default
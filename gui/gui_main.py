@@ -11,13 +11,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from db.src.DBConnectionHandler import DbConnectionHandler
 from db.src.DBComparator import DBObjectComparator
+from db.src.DBShardedComparator import ShardedDBObjectComparator
+from db.src.DBSampleComparator import DataDistributionComparator
+from db.src.DBHistoryStore import RunHistoryStore
 
 
-def clean_output_directory(directory):
-    """Delete all files in the specified directory."""
+def clean_output_directory(directory, keep=()):
+    """Delete all files in the specified directory, except those in `keep`."""
     if os.path.exists(directory):
         for filename in os.listdir(directory):
             file_path = os.path.join(directory, filename)
+            if file_path in keep:
+                continue
             try:
                 # Delete files and directories
                 if os.path.isfile(file_path) or os.path.islink(file_path):
@@ -52,26 +57,63 @@ class DatabaseComparatorGUI:
         self.entry_schema = tk.Entry(master)
         self.entry_schema.grid(row=2, column=1, padx=5, pady=5)
 
+        # Label and entry for the number of worker processes (schema-sharded mode)
+        self.label_workers = tk.Label(master, text="Nombre de processus (optionnel, tous les schemas):")
+        self.label_workers.grid(row=3, column=0, padx=5, pady=5)
+        self.entry_workers = tk.Entry(master)
+        self.entry_workers.grid(row=3, column=1, padx=5, pady=5)
+
+        # Label and entry for the data distribution sampling percent
+        self.label_sample = tk.Label(master, text="Pourcentage d'echantillon des donnees (optionnel):")
+        self.label_sample.grid(row=4, column=0, padx=5, pady=5)
+        self.entry_sample = tk.Entry(master)
+        self.entry_sample.grid(row=4, column=1, padx=5, pady=5)
+
+        # Label and entry for the concurrent sampling queries budget
+        self.label_max_queries = tk.Label(master, text="Requetes d'echantillon simultanees (defaut: 4):")
+        self.label_max_queries.grid(row=5, column=0, padx=5, pady=5)
+        self.entry_max_queries = tk.Entry(master)
+        self.entry_max_queries.grid(row=5, column=1, padx=5, pady=5)
+
+        # Checkbox for the column fingerprint mode
+        self.fingerprint_var = tk.BooleanVar(value=False)
+        self.check_fingerprint = tk.Checkbutton(master, text="Comparer les colonnes par empreintes (schema/table)",
+                                                variable=self.fingerprint_var)
+        self.check_fingerprint.grid(row=6, column=0, columnspan=2, padx=5, pady=5)
+
         # Compare button
         self.compare_button = tk.Button(master, text="Comparer", command=self.compare_databases)
-        self.compare_button.grid(row=3, column=0, columnspan=2, pady=10)
+        self.compare_button.grid(row=7, column=0, columnspan=2, pady=10)
 
         # Text area for output messages
         self.text_output = tk.Text(master, height=10, width=60)
-        self.text_output.grid(row=4, column=0, columnspan=2, padx=5, pady=5)
+        self.text_output.grid(row=8, column=0, columnspan=2, padx=5, pady=5)
 
     def compare_databases(self):
         db1_name = self.entry_db1.get()
         db2_name = self.entry_db2.get()
         schema_name = self.entry_schema.get() or None
+        fingerprint = self.fingerprint_var.get()
 
         # Clear the output text
         self.text_output.delete(1.0, tk.END)
 
         try:
+            workers = int(self.entry_workers.get() or 0) or None
+            sample_percent = float(self.entry_sample.get() or 0) or None
+            max_queries = int(self.entry_max_queries.get() or 4)
+
+            # Validate the sampling budget before the structural comparison runs
+            distribution_comparator = None
+            if sample_percent:
+                distribution_comparator = DataDistributionComparator(db1_name, db2_name, schema=schema_name,
+                                                                     sample_percent=sample_percent,
+                                                                     max_concurrent_queries=max_queries)
+
             # Clean the data directory before comparison
             output_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
-            clean_output_directory(output_dir)
+            history_db_path = os.path.join(output_dir, 'history.sqlite3')
+            clean_output_directory(output_dir, keep=(history_db_path,))
             self.text_output.insert(tk.END, "Dossier data nettoyé.\n")
 
             # Initialize the database connection handler
@@ -81,17 +123,31 @@ class DatabaseComparatorGUI:
             conn1 = connections.get(db1_name)
             conn2 = connections.get(db2_name)
 
-            # Initialize the comparator
-            comparator = DBObjectComparator(conn1, conn2, schema=schema_name)
+            # Initialize the comparator (sharded across worker processes when requested without schema)
+            if workers and schema_name is None:
+                comparator = ShardedDBObjectComparator(db1_name, db2_name, workers=workers, fingerprint=fingerprint)
+            else:
+                comparator = DBObjectComparator(conn1, conn2, schema=schema_name, fingerprint=fingerprint)
 
             # Perform the comparison
             comparator.compare_objects()
+            differences = dict(comparator.differences)
+
+            # Compare sampled data distributions of shared tables
+            if distribution_comparator:
+                distribution_comparator.compare_objects()
+                differences.update(distribution_comparator.differences)
+
+            # Record the run in the history store
+            with RunHistoryStore(history_db_path) as history:
+                history.record_run(differences, db1=db1_name, db2=db2_name, schema=schema_name)
 
             # Close the connections
             db_handler.close_connections()
 
             self.text_output.insert(tk.END, "Comparaison effectue avec succes.\n")
-            self.text_output.insert(tk.END, "Regarder le dossier 'data' pour voir les CSV de comparaisons.")
+            self.text_output.insert(tk.END, "Regarder le dossier 'data' pour voir les CSV de comparaisons.\n")
+            self.text_output.insert(tk.END, "Historique des executions enregistre dans 'data/history.sqlite3'.")
 
         except Exception as e:
             messagebox.showerror("Erreur", str(e))
@@ -1,14 +1,19 @@
 import os
-from config import output_dir
+from config import output_dir, history_db_path
 from db.src.DBConnectionHandler import DbConnectionHandler
 from db.src.DBComparator import DBObjectComparator
+from db.src.DBShardedComparator import ShardedDBObjectComparator
+from db.src.DBSampleComparator import DataDistributionComparator
+from db.src.DBHistoryStore import RunHistoryStore
 
 
-def clean_output_directory(directory):
-    """Delete all files in the specified directory, excluding subdirectories."""
+def clean_output_directory(directory, keep=()):
+    """Delete all files in the specified directory, excluding subdirectories and files in `keep`."""
     if os.path.exists(directory):
         for filename in os.listdir(directory):
             file_path = os.path.join(directory, filename)
+            if file_path in keep:
+                continue
             try:
                 # Only delete files, not directories
                 if os.path.isfile(file_path) or os.path.islink(file_path):
@@ -23,8 +28,8 @@ def clean_output_directory(directory):
 
 
 if __name__ == '__main__':
-    # Clean directory before each execution
-    clean_output_directory(output_dir)
+    # Clean directory before each execution (the run history is kept)
+    clean_output_directory(output_dir, keep=(history_db_path,))
 
     # Prompt the user for the database names
     input_db1 = input("Enter the name of the first database (db1 | e.g : PG-TEST): ")
@@ -33,6 +38,31 @@ if __name__ == '__main__':
     # Prompt the user for the schema name (optional)
     input_schema = input("Enter the schema name to compare (leave blank for default schema): ") or None
 
+    # Prompt the user for the column fingerprint mode (optional)
+    input_fingerprint = input("Compare columns by schema/table fingerprints first? (y/N): ").strip().lower() == 'y'
+
+    # Prompt the user for the number of worker processes (schema-sharded mode, all schemas only)
+    input_workers = None
+    if input_schema is None:
+        input_workers = int(input("Number of worker processes for schema-sharded comparison "
+                                  "(leave blank for a single pass): ") or 0) or None
+
+    # Prompt the user for the data distribution sampling percent (optional)
+    input_sample_percent = float(input("Sample percent for data distribution comparison "
+                                       "(leave blank to skip): ") or 0) or None
+
+    # Prompt the user for the concurrent sampling queries budget (optional)
+    input_max_queries = None
+    if input_sample_percent:
+        input_max_queries = int(input("Maximum concurrent sampling queries (leave blank for 4): ") or 4)
+
+    # Validate the sampling budget before the structural comparison runs
+    distribution_comparator = None
+    if input_sample_percent:
+        distribution_comparator = DataDistributionComparator(input_db1, input_db2, schema=input_schema,
+                                                             sample_percent=input_sample_percent,
+                                                             max_concurrent_queries=input_max_queries)
+
     # Initialize the database connection handler
     db_handler = DbConnectionHandler(input_db1, input_db2)
 
@@ -46,11 +76,25 @@ if __name__ == '__main__':
     conn1 = connections.get(input_db1)
     conn2 = connections.get(input_db2)
 
-    # Initialize the DBObjectComparator with the schema
-    comparator = DBObjectComparator(conn1, conn2, schema=input_schema)
+    # Initialize the comparator: sharded across worker processes, or a single pass with the schema
+    if input_workers:
+        comparator = ShardedDBObjectComparator(input_db1, input_db2, workers=input_workers,
+                                               fingerprint=input_fingerprint)
+    else:
+        comparator = DBObjectComparator(conn1, conn2, schema=input_schema, fingerprint=input_fingerprint)
 
     # Compare objects within the schema
     comparator.compare_objects()
+    differences = dict(comparator.differences)
+
+    # Compare sampled data distributions of shared tables
+    if distribution_comparator:
+        distribution_comparator.compare_objects()
+        differences.update(distribution_comparator.differences)
+
+    # Record the run in the history store
+    with RunHistoryStore(history_db_path) as history:
+        history.record_run(differences, db1=input_db1, db2=input_db2, schema=input_schema)
 
     # Close the connections when done
     db_handler.close_connections()